@@ -5,6 +5,7 @@ from __future__ import annotations
 import hashlib
 import io
 import logging
+import mimetypes
 import os
 from collections.abc import Callable, Generator
 from pathlib import Path
@@ -13,7 +14,7 @@ from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
+from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload, MediaIoBaseUpload
 
 logger = logging.getLogger(__name__)
 
@@ -221,6 +222,30 @@ class GDriveClient:
         logger.debug("Uploaded %s  (id=%s)", local_path.name, response["id"])
         return response
 
+    def upload_bytes(
+        self,
+        name: str,
+        data: bytes,
+        parent_folder_id: str,
+        progress_callback: Callable[[int, int], None] | None = None,
+    ) -> dict:
+        """Upload in-memory *data* as *name* into *parent_folder_id*. Returns the Google Drive file metadata."""
+        mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        media = MediaIoBaseUpload(io.BytesIO(data), mimetype=mimetype, resumable=True)
+        meta = {"name": name, "parents": [parent_folder_id]}
+        request = self._service.files().create(
+            body=meta, media_body=media, fields="id,name,md5Checksum,size"
+        )
+        response = None
+        while response is None:
+            status, response = request.next_chunk()
+            if status and progress_callback:
+                progress_callback(int(status.resumable_progress), int(status.total_size))
+        if progress_callback and response:
+            progress_callback(len(data), len(data))
+        logger.debug("Uploaded %s  (id=%s)", name, response["id"])
+        return response
+
     def update_file(
         self,
         file_id: str,
@@ -265,6 +290,20 @@ class GDriveClient:
         local_md5 = self.compute_local_md5(local_path)
         return local_md5 == gdrive_md5
 
+    def verify_bytes(self, data: bytes, uploaded_meta: dict) -> bool:
+        """Compare the MD5 of in-memory *data* against the MD5 Google Drive computed on upload."""
+        gdrive_md5 = uploaded_meta.get("md5Checksum")
+        if not gdrive_md5:
+            gdrive_md5 = self.get_file_md5(uploaded_meta["id"])
+        if not gdrive_md5:
+            logger.warning(
+                "Google Drive did not return an MD5 for %s \u2013 skipping verification.",
+                uploaded_meta.get("name", uploaded_meta["id"]),
+            )
+            return True
+
+        return hashlib.md5(data).hexdigest() == gdrive_md5
+
     def get_file_md5(self, file_id: str) -> str | None:
         """Return the md5Checksum reported by Google Drive for *file_id*."""
         meta = self._service.files().get(fileId=file_id, fields="md5Checksum").execute()
@@ -41,6 +41,9 @@ class OneDriveClient:
             token_cache=self._cache,
         )
         self._redirect_uri = redirect_uri
+        # One keep-alive connection pool for every Graph call; large uploads
+        # send many sequential chunk PUTs to the same upload host.
+        self._session = requests.Session()
 
     # ── authentication ──────────────────────────────────────────────
 
@@ -111,7 +114,7 @@ class OneDriveClient:
             else f"{GRAPH_BASE}/me/drive/root:/{self._encode_path(path)}:/children"
         )
         while endpoint:
-            resp = requests.get(endpoint, headers=self._headers(), timeout=30)
+            resp = self._session.get(endpoint, headers=self._headers(), timeout=30)
             resp.raise_for_status()
             data = resp.json()
             for item in data.get("value", []):
@@ -147,9 +150,31 @@ class OneDriveClient:
         local_path = Path(dest_dir) / relative
         local_path.parent.mkdir(parents=True, exist_ok=True)
 
+        logger.debug("Downloading %s ...", relative)
+        with open(local_path, "wb") as f:
+            for chunk in self._iter_content(file_meta, progress_callback):
+                f.write(chunk)
+
+        return local_path
+
+    def download_bytes(
+        self,
+        file_meta: dict,
+        progress_callback: Callable[[int, int], None] | None = None,
+    ) -> bytes:
+        """Download a single file straight into memory, skipping the temp directory."""
+        logger.debug("Downloading %s into memory ...", file_meta["path"])
+        return b"".join(self._iter_content(file_meta, progress_callback))
+
+    def _iter_content(
+        self,
+        file_meta: dict,
+        progress_callback: Callable[[int, int], None] | None = None,
+    ) -> Generator[bytes, None, None]:
+        """Yield the content of *file_meta* in chunks as it arrives from OneDrive."""
         # Always fetch a fresh download URL – the one captured during list_files
         # contains a short-lived tempauth token that expires within seconds.
-        meta_resp = requests.get(
+        meta_resp = self._session.get(
             f"{GRAPH_BASE}/me/drive/items/{file_meta['id']}",
             headers=self._headers(),
             timeout=30,
@@ -159,20 +184,16 @@ class OneDriveClient:
         if not url:
             url = f"{GRAPH_BASE}/me/drive/items/{file_meta['id']}/content"
 
-        logger.debug("Downloading %s ...", relative)
-        resp = requests.get(url, stream=True, timeout=120)
+        resp = self._session.get(url, stream=True, timeout=120)
         resp.raise_for_status()
 
         total_size = file_meta.get("size") or int(resp.headers.get("Content-Length", 0))
         downloaded = 0
-        with open(local_path, "wb") as f:
-            for chunk in resp.iter_content(chunk_size=8192):
-                f.write(chunk)
-                downloaded += len(chunk)
-                if progress_callback:
-                    progress_callback(downloaded, total_size)
-
-        return local_path
+        for chunk in resp.iter_content(chunk_size=8192):
+            downloaded += len(chunk)
+            yield chunk
+            if progress_callback:
+                progress_callback(downloaded, total_size)
 
     # ── folder creation ─────────────────────────────────────────────
 
@@ -188,7 +209,7 @@ class OneDriveClient:
             # Check if folder exists
             encoded = self._encode_path(target_path)
             check_url = f"{GRAPH_BASE}/me/drive/root:/{encoded}:"
-            resp = requests.get(check_url, headers=self._headers(), timeout=30)
+            resp = self._session.get(check_url, headers=self._headers(), timeout=30)
             if resp.status_code == 404:
                 # Create the folder
                 if current_path == "/":
@@ -201,7 +222,7 @@ class OneDriveClient:
                     "folder": {},
                     "@microsoft.graph.conflictBehavior": "fail",
                 }
-                create_resp = requests.post(
+                create_resp = self._session.post(
                     parent_url,
                     headers={**self._headers(), "Content-Type": "application/json"},
                     json=body,
@@ -223,7 +244,7 @@ class OneDriveClient:
         file_path = f"{parent_path.rstrip('/')}/{name}"
         encoded = self._encode_path(file_path)
         url = f"{GRAPH_BASE}/me/drive/root:/{encoded}:"
-        resp = requests.get(url, headers=self._headers(), timeout=30)
+        resp = self._session.get(url, headers=self._headers(), timeout=30)
         if resp.status_code == 404:
             return None
         resp.raise_for_status()
@@ -254,7 +275,7 @@ class OneDriveClient:
             url = f"{GRAPH_BASE}/me/drive/root:/{encoded}:/content"
             with open(local_path, "rb") as f:
                 data = f.read()
-            resp = requests.put(
+            resp = self._session.put(
                 url,
                 headers={**self._headers(), "Content-Type": "application/octet-stream"},
                 data=data,
@@ -281,7 +302,7 @@ class OneDriveClient:
             url = f"{GRAPH_BASE}/me/drive/items/{item_id}/content"
             with open(local_path, "rb") as f:
                 data = f.read()
-            resp = requests.put(
+            resp = self._session.put(
                 url,
                 headers={**self._headers(), "Content-Type": "application/octet-stream"},
                 data=data,
@@ -296,7 +317,7 @@ class OneDriveClient:
             # Create upload session via item ID
             session_url = f"{GRAPH_BASE}/me/drive/items/{item_id}/createUploadSession"
             body = {"item": {"@microsoft.graph.conflictBehavior": "replace"}}
-            resp = requests.post(
+            resp = self._session.post(
                 session_url,
                 headers={**self._headers(), "Content-Type": "application/json"},
                 json=body,
@@ -317,7 +338,7 @@ class OneDriveClient:
         encoded = self._encode_path(dest_path)
         url = f"{GRAPH_BASE}/me/drive/root:/{encoded}:/createUploadSession"
         body = {"item": {"@microsoft.graph.conflictBehavior": "replace"}}
-        resp = requests.post(
+        resp = self._session.post(
             url,
             headers={**self._headers(), "Content-Type": "application/json"},
             json=body,
@@ -334,8 +355,10 @@ class OneDriveClient:
         file_size: int,
         progress_callback: Callable[[int, int], None] | None = None,
     ) -> dict:
-        """Upload a file in 10 MB chunks to a resumable upload session URL."""
-        chunk_size = 10 * 1024 * 1024  # 10 MB (multiple of 320 KiB)
+        """Upload a file in 50 MiB chunks to a resumable upload session URL."""
+        # Must be a multiple of 320 KiB and below Graph's 60 MiB per-request cap;
+        # fewer, larger chunks mean fewer round trips per file.
+        chunk_size = 160 * 320 * 1024  # 50 MiB
         uploaded = 0
         result = None
         with open(local_path, "rb") as f:
@@ -346,7 +369,7 @@ class OneDriveClient:
                     "Content-Length": str(len(chunk_data)),
                     "Content-Range": f"bytes {uploaded}-{chunk_end}/{file_size}",
                 }
-                chunk_resp = requests.put(
+                chunk_resp = self._session.put(
                     upload_url, headers=headers, data=chunk_data, timeout=120
                 )
                 chunk_resp.raise_for_status()
@@ -360,7 +383,7 @@ class OneDriveClient:
     def delete_file(self, item_id: str) -> None:
         """Delete a file from OneDrive."""
         url = f"{GRAPH_BASE}/me/drive/items/{item_id}"
-        resp = requests.delete(url, headers=self._headers(), timeout=30)
+        resp = self._session.delete(url, headers=self._headers(), timeout=30)
         resp.raise_for_status()
         logger.info("Deleted OneDrive file: %s", item_id)
 
@@ -384,7 +407,7 @@ class OneDriveClient:
     def get_file_sha256(self, item_id: str) -> str | None:
         """Return the sha256Hash reported by OneDrive for the given item."""
         url = f"{GRAPH_BASE}/me/drive/items/{item_id}"
-        resp = requests.get(url, headers=self._headers(), timeout=30)
+        resp = self._session.get(url, headers=self._headers(), timeout=30)
         resp.raise_for_status()
         return resp.json().get("file", {}).get("hashes", {}).get("sha256Hash")
 
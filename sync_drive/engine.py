@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import logging
+import os
 import shutil
 from dataclasses import dataclass, field
 from pathlib import Path, PurePosixPath
@@ -21,14 +22,43 @@ from rich.progress import (
 
 logger = logging.getLogger(__name__)
 
+# Files up to this size skip the temp directory when both clients support
+# in-memory transfer (download_bytes / upload_bytes / verify_bytes).
+IN_MEMORY_THRESHOLD = 64 * 1024 * 1024
+
+
+_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
+
 
 def format_size(num_bytes: int) -> str:
     """Return a human-readable file size string."""
-    for unit in ("B", "KB", "MB", "GB", "TB"):
-        if abs(num_bytes) < 1024:
-            return f"{num_bytes:.1f} {unit}" if unit != "B" else f"{num_bytes} {unit}"
-        num_bytes /= 1024  # type: ignore[assignment]
-    return f"{num_bytes:.1f} PB"
+    if abs(num_bytes) < 1024:
+        return f"{num_bytes} B"
+    # Each unit step is 2**10, so the unit index falls out of the bit length.
+    unit_idx = min(len(_SIZE_UNITS) - 1, (abs(int(num_bytes)).bit_length() - 1) // 10)
+    return f"{num_bytes / (1 << (10 * unit_idx)):.1f} {_SIZE_UNITS[unit_idx]}"
+
+
+def _fadvise(path: Path, advice_name: str) -> None:
+    """Give the kernel a page-cache hint for *path*; a no-op where unsupported (e.g. Windows).
+
+    The hint goes through a short-lived descriptor, so only advice acting on the
+    shared page cache (such as POSIX_FADV_DONTNEED) has any effect; per-open-file
+    advice like SEQUENTIAL would be lost when it is closed.
+    """
+    advice = getattr(os, advice_name, None)
+    if advice is None or not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, advice)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
 
 
 @dataclass
@@ -110,6 +140,17 @@ class SyncEngine:
     def _update(self, file_id, local_path, progress_callback=None):
         return self._dest_client.update_file(file_id, local_path, progress_callback=progress_callback)
 
+    def _can_transfer_in_memory(self, file_meta, existing) -> bool:
+        """Whether *file_meta* can go source -> destination without touching the temp dir."""
+        size = file_meta.get("size") or 0
+        return (
+            0 < size <= IN_MEMORY_THRESHOLD
+            and not (existing and self._on_duplicate == "overwrite")
+            and hasattr(self._source_client, "download_bytes")
+            and hasattr(self._dest_client, "upload_bytes")
+            and hasattr(self._dest_client, "verify_bytes")
+        )
+
     def _delete_source(self, file_meta):
         """Delete the file from source storage."""
         try:
@@ -278,9 +319,18 @@ class SyncEngine:
                 file_progress.update(_task, completed=downloaded)
         logger.info("[1/3] Downloading: %s (%s)", rel_path, size_str)
 
-        local_path = self._download(
-            file_meta, str(temp), progress_callback=dl_callback
-        )
+        # Small files are held in memory, saving a temp-file write plus two
+        # re-reads (upload and checksum).
+        data: bytes | None = None
+        local_path: Path | None = None
+        if self._can_transfer_in_memory(file_meta, existing):
+            data = self._source_client.download_bytes(
+                file_meta, progress_callback=dl_callback
+            )
+        else:
+            local_path = self._download(
+                file_meta, str(temp), progress_callback=dl_callback
+            )
         result.transferred.append(rel_path)
         result.total_bytes += file_size
 
@@ -301,6 +351,11 @@ class SyncEngine:
             uploaded = self._update(
                 existing["id"], local_path, progress_callback=ul_callback
             )
+        elif data is not None:
+            logger.info("[2/3] Uploading : %s (%s)", rel_path, size_str)
+            uploaded = self._dest_client.upload_bytes(
+                file_meta["name"], data, dest_parent, progress_callback=ul_callback
+            )
         else:
             logger.info("[2/3] Uploading : %s (%s)", rel_path, size_str)
             uploaded = self._upload(
@@ -312,7 +367,14 @@ class SyncEngine:
 
         # 5. Verify integrity
         logger.info("[3/3] Verifying : %s", rel_path)
-        if self._verify(local_path, uploaded):
+        if data is not None:
+            verified = self._dest_client.verify_bytes(data, uploaded)
+        else:
+            verified = self._verify(local_path, uploaded)
+            # The temp copy is never read again; drop it from the page cache so
+            # a large sync does not evict other processes' hot pages.
+            _fadvise(local_path, "POSIX_FADV_DONTNEED")
+        if verified:
             result.verified.append(rel_path)
             logger.info("  OK  %s", rel_path)
             
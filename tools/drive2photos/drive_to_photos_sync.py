@@ -5,10 +5,12 @@ Google Drive → Google Photos Sync Script  (v2)
 Features
 --------
 - Multi-threaded uploads (--workers N, default 10)
+- Streaming transfers : unless hash dedup is on, files flow Drive → Photos
+                        chunk by chunk instead of being buffered in memory
 - Three dedup modes  : filename | hash | filename+hash
 - Photos library cache: avoids re-scanning on every run (--refresh-cache to force)
 - Metadata preserved : original filename + Drive timestamps stored in description
-- Thread-safe state  : uploaded_ids.json and uploaded_hashes.json, atomic saves
+- Thread-safe state  : uploaded IDs and hashes in SQLite (sync_state.db, WAL)
 - Graceful Ctrl+C    : saves progress before exiting
 - Progress saved every N files (--save-every N, default 25)
 - Dry-run mode       : shows what would be uploaded / skipped without touching Photos
@@ -25,9 +27,9 @@ File structure (all created automatically on first run)
 -------------------------------------------------------
   credentials.json.json        — OAuth credentials  (you supply this)
   token.json                — Cached OAuth token (auto-refreshed)
-  uploaded_ids.json         — Drive file IDs already uploaded (progress log)
-  uploaded_hashes.json      — SHA-256 hashes of uploaded content (hash dedup)
-  photos_filename_cache.json— Cached list of Photos filenames   (filename dedup)
+  sync_state.db             — Drive file IDs already uploaded (progress log)
+                              and SHA-256 hashes of uploaded content (hash dedup)
+  photos_filename_cache.txt — Cached list of Photos filenames   (filename dedup)
 
 Usage examples
 --------------
@@ -42,10 +44,13 @@ Dedup mode details
 ------------------
   none          — no dedup; fastest, but Photos may contain duplicates
   filename      — skip if the filename already exists anywhere in Photos
-                  (fast pre-download check; false-positive rate depends on
-                  how unique your filenames are)
+                  (case-insensitive, so IMG_1.JPG matches img_1.jpg; fast
+                  pre-download check; false-positive rate depends on how
+                  unique your filenames are)
   hash          — download file first, compute SHA-256, skip if this script
-                  has uploaded the same content before (tracks uploaded_hashes.json)
+                  has uploaded the same content before (tracked in sync_state.db).
+                  A filename match in the Photos cache is treated as a duplicate
+                  before downloading, unless --strict-hash is given
   filename+hash — skip if EITHER a filename match OR a hash match is found;
                   most thorough option; requires download before deciding on hash
 """
@@ -54,27 +59,35 @@ Dedup mode details
 # Standard-library imports
 # ============================================================
 import argparse
+import functools
 import hashlib
 import io
 import json
 import os
+import random
 import signal
+import sqlite3
 import sys
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime, timezone
-from typing import Callable, Dict, List, Optional, Set, Tuple
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import (
+    Callable, Deque, Dict, Iterator, List, Optional, Set, Tuple, Union,
+)
 
 # ============================================================
 # Third-party imports
 # ============================================================
+import google_auth_httplib2
 import requests
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest, MediaIoBaseDownload, build_http
 
 # ============================================================
 # Constants
@@ -92,15 +105,21 @@ CLIENT_SECRET_FILE = "../../credentials.json"
 TOKEN_FILE = "../../token.json"
 
 # Persistent state files
+SYNC_STATE_DB_FILE = "sync_state.db"
+# Older JSON state files; imported into SYNC_STATE_DB_FILE on first run
 UPLOADED_IDS_FILE = "uploaded_ids.json"
 UPLOADED_HASHES_FILE = "uploaded_hashes.json"
-PHOTOS_FILENAME_CACHE_FILE = "photos_filename_cache.json"
+PHOTOS_FILENAME_CACHE_FILE = "photos_filename_cache.txt"
+# Older JSON cache format; read once and migrated to the line-based format
+LEGACY_PHOTOS_FILENAME_CACHE_FILE = "photos_filename_cache.json"
 
 # Google Photos API endpoints
 PHOTOS_UPLOAD_URL = "https://photoslibrary.googleapis.com/v1/uploads"
 PHOTOS_BATCH_CREATE_URL = "https://photoslibrary.googleapis.com/v1/mediaItems:batchCreate"
 PHOTOS_LIST_URL = "https://photoslibrary.googleapis.com/v1/mediaItems"
 
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+
 # Media types this script handles
 SUPPORTED_MIME_TYPES = [
     "image/jpeg", "image/png", "image/gif", "image/webp",
@@ -108,13 +127,46 @@ SUPPORTED_MIME_TYPES = [
     "video/mp4", "video/quicktime", "video/x-msvideo",
     "video/mpeg", "video/3gpp",
 ]
+# Drive query fragment matching any supported media type
+_MIME_FILTER_CLAUSE = " or ".join(f"mimeType='{m}'" for m in SUPPORTED_MIME_TYPES)
+
+# Digest used by the hash dedup modes.  Recorded hashes are keyed by it,
+# so switching algorithms would silently invalidate every recorded hash.
+# hashlib's OpenSSL SHA-256 uses SHA-NI / ARMv8 crypto extensions where
+# available and releases the GIL on large buffers, so worker threads hash
+# in parallel.
+CONTENT_HASH_ALGORITHM = "sha256"
+
+# Access tokens are refreshed this long before they expire, so a request
+# never goes out with a token that lapses while it is in flight
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
 
 DEFAULT_WORKERS = 10
 DEFAULT_SAVE_EVERY = 25
 
-# Retry config for transient HTTP errors (rate limits, 5xx)
+# Tasks queued per worker thread ahead of execution.  Submitting lazily keeps
+# memory flat however many files are pending.
+SUBMIT_AHEAD_PER_WORKER = 4
+
+BYTES_PER_MB = 1024 * 1024
+
+# Drive download chunk when streaming straight into a Photos upload
+DOWNLOAD_CHUNK_SIZE = 8 * BYTES_PER_MB
+
+# Concurrent files.list calls while walking a folder tree
+FOLDER_SCAN_WORKERS = 16
+
+# Parent folders OR-ed into one media files.list query.  Larger groups mean
+# fewer round trips but longer query strings; ~20 stays well within Drive's
+# query-length limits.
+FOLDER_QUERY_BATCH_SIZE = 20
+
+# Retry config for transient HTTP errors (rate limits, 5xx).  Drive list
+# calls pass MAX_RETRIES as num_retries, so googleapiclient retries 429,
+# 403 rateLimitExceeded and 5xx responses with its own exponential backoff.
 MAX_RETRIES = 3
 RETRY_BASE_DELAY = 2.0  # seconds; doubled on each attempt
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
 
 
 # ============================================================
@@ -157,8 +209,61 @@ def authenticate() -> Credentials:
     return creds
 
 
+class TokenRefreshManager:
+    """
+    Hands out a valid OAuth access token to every thread.
+
+    While the token has more than TOKEN_REFRESH_MARGIN left, get_token()
+    returns it without taking any lock.  Once it is about to expire, the
+    first caller refreshes it and publishes the outcome on a Future; callers
+    arriving during the refresh wait on that same Future instead of issuing
+    refreshes of their own.
+    """
+
+    def __init__(self, creds: Credentials) -> None:
+        self._creds = creds
+        self._lock = threading.Lock()
+        self._refresh_future: Optional[Future] = None
+
+    def _needs_refresh(self) -> bool:
+        if not self._creds.token:
+            return True
+        expiry = self._creds.expiry
+        if expiry is None:
+            return False
+        # google-auth stores expiry as a naive UTC datetime
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return expiry - now < TOKEN_REFRESH_MARGIN
+
+    def get_token(self) -> str:
+        """Return a current access token, refreshing it first if needed."""
+        if not self._needs_refresh():
+            return self._creds.token
+
+        with self._lock:
+            future = self._refresh_future
+            owner = future is None
+            if owner:
+                # Another thread may have finished a refresh while we waited
+                if not self._needs_refresh():
+                    return self._creds.token
+                future = self._refresh_future = Future()
+
+        if owner:
+            try:
+                self._creds.refresh(Request())
+                future.set_result(self._creds.token)
+            except Exception as exc:
+                future.set_exception(exc)
+            finally:
+                with self._lock:
+                    self._refresh_future = None
+
+        return future.result()
+
+
 # ============================================================
-# Persistent JSON helpers  (atomic writes to prevent corruption)
+# Persistence helpers  (SQLite state, legacy JSON import)
 # ============================================================
 
 def _load_json_set(path: str) -> Set[str]:
@@ -169,17 +274,66 @@ def _load_json_set(path: str) -> Set[str]:
     return set()
 
 
-def _save_json_set(data: Set[str], path: str) -> None:
+def _open_state_db(path: str) -> sqlite3.Connection:
+    """
+    Open (creating if needed) the SQLite database holding the sync state.
+
+    WAL mode lets concurrently running instances read while one writes, and
+    synchronous=NORMAL keeps commits cheap while staying crash-safe.  The
+    connection is shared by all threads; callers serialise access.
+    """
+    db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    for table in ("uploaded_ids", "uploaded_hashes"):
+        db.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} "
+            "(value TEXT PRIMARY KEY) WITHOUT ROWID"
+        )
+    db.commit()
+    return db
+
+
+def _load_db_set(db: sqlite3.Connection, table: str, legacy_path: str) -> Set[str]:
     """
-    Atomically save a set to a JSON array file.
+    Load *table* as a Python set.  An empty table is seeded once from the
+    older JSON file at *legacy_path*, if one exists.
+    """
+    values = {row[0] for row in db.execute(f"SELECT value FROM {table}")}
+    if not values and os.path.exists(legacy_path):
+        values = _load_json_set(legacy_path)
+        db.executemany(
+            f"INSERT OR IGNORE INTO {table} (value) VALUES (?)",
+            ((v,) for v in values),
+        )
+        db.commit()
+        print(f"  Imported {len(values):,} entries from {legacy_path}")
+    return values
 
-    Writes to a .tmp sibling first then renames, so a crash mid-write never
-    leaves a truncated file.
+
+def _peek_db_set(table: str, legacy_path: str) -> Set[str]:
+    """
+    Read-only counterpart of _load_db_set: read *table* from an existing
+    database without creating it, falling back to the older JSON file just
+    as _load_db_set would, and never migrating anything.
     """
-    tmp = path + ".tmp"
-    with open(tmp, "w") as fh:
-        json.dump(sorted(data), fh)
-    os.replace(tmp, path)
+    if os.path.exists(SYNC_STATE_DB_FILE):
+        # mode=ro on a WAL database still creates -wal/-shm files.  With no
+        # -wal present the last writer checkpointed cleanly, so open it
+        # immutable and leave the directory untouched; otherwise the WAL
+        # holds committed rows and must be read (which needs the -shm).
+        if os.path.exists(SYNC_STATE_DB_FILE + "-wal"):
+            uri = f"file:{SYNC_STATE_DB_FILE}?mode=ro"
+        else:
+            uri = f"file:{SYNC_STATE_DB_FILE}?immutable=1"
+        db = sqlite3.connect(uri, uri=True)
+        try:
+            values = {row[0] for row in db.execute(f"SELECT value FROM {table}")}
+        finally:
+            db.close()
+        if values:
+            return values
+    return _load_json_set(legacy_path)
 
 
 # ============================================================
@@ -190,15 +344,24 @@ class SyncState:
     """
     Central, thread-safe container for tracking all upload progress.
 
-    Maintains two on-disk sets that persist across runs:
-      uploaded_ids.json    — Drive file IDs that were successfully uploaded
-      uploaded_hashes.json — SHA-256 content hashes that were successfully uploaded
+    Maintains two sets that persist across runs, as tables in
+    sync_state.db:
+      uploaded_ids    — Drive file IDs that were successfully uploaded
+      uploaded_hashes — SHA-256 content hashes that were successfully uploaded
 
-    Progress is saved every `save_every` completed operations.  Calling
+    New entries are inserted in one short transaction every `save_every`
+    completed operations, so a save costs the same however large the
+    history is, and other instances are never locked out for long.  Calling
     flush() forces an immediate save (used on shutdown).
+
+    With read_only=True (used by --dry-run) the state is only read: the
+    database is neither created nor written, legacy JSON files are read but
+    not imported, and saves are no-ops.
     """
 
-    def __init__(self, save_every: int = DEFAULT_SAVE_EVERY) -> None:
+    def __init__(
+        self, save_every: int = DEFAULT_SAVE_EVERY, read_only: bool = False
+    ) -> None:
         self._lock = threading.Lock()
         self.save_every = save_every
         self._ops_since_save = 0
@@ -209,19 +372,35 @@ class SyncState:
         self.fail_count = 0
         self.skip_count = 0
 
-        # Loaded from disk; updated in memory and periodically flushed
-        self.uploaded_ids: Set[str] = _load_json_set(UPLOADED_IDS_FILE)
-        self.uploaded_hashes: Set[str] = _load_json_set(UPLOADED_HASHES_FILE)
+        # Loaded from disk; mirrored in memory so lookups never touch SQLite.
+        # Keep these as sets: main() filters pending files with an "in" test
+        # on uploaded_ids and is_uploaded_hash runs once per file, so both
+        # must stay O(1) even with hundreds of thousands of entries.
+        self._db: Optional[sqlite3.Connection] = None
+        if read_only:
+            self.uploaded_ids: Set[str] = _peek_db_set(
+                "uploaded_ids", UPLOADED_IDS_FILE
+            )
+            self.uploaded_hashes: Set[str] = _peek_db_set(
+                "uploaded_hashes", UPLOADED_HASHES_FILE
+            )
+        else:
+            self._db = _open_state_db(SYNC_STATE_DB_FILE)
+            self.uploaded_ids = _load_db_set(
+                self._db, "uploaded_ids", UPLOADED_IDS_FILE
+            )
+            self.uploaded_hashes = _load_db_set(
+                self._db, "uploaded_hashes", UPLOADED_HASHES_FILE
+            )
+        # Recorded since the last save, not yet written to the database
+        self._unsaved_ids: List[str] = []
+        self._unsaved_hashes: List[str] = []
 
         # Set this to ask all worker threads to wind down gracefully
         self.shutdown = threading.Event()
 
     # ---- Queries ----
 
-    def is_uploaded_id(self, file_id: str) -> bool:
-        with self._lock:
-            return file_id in self.uploaded_ids
-
     def is_uploaded_hash(self, file_hash: str) -> bool:
         with self._lock:
             return file_hash in self.uploaded_hashes
@@ -233,8 +412,10 @@ class SyncState:
     ) -> None:
         with self._lock:
             self.uploaded_ids.add(file_id)
+            self._unsaved_ids.append(file_id)
             if file_hash:
                 self.uploaded_hashes.add(file_hash)
+                self._unsaved_hashes.append(file_hash)
             self.success_count += 1
             self._ops_since_save += 1
             if self._ops_since_save >= self.save_every:
@@ -251,9 +432,20 @@ class SyncState:
     # ---- Persistence ----
 
     def _persist(self) -> None:
-        """Write state to disk.  MUST be called with self._lock held."""
-        _save_json_set(self.uploaded_ids, UPLOADED_IDS_FILE)
-        _save_json_set(self.uploaded_hashes, UPLOADED_HASHES_FILE)
+        """Write unsaved entries to disk.  MUST be called with self._lock held."""
+        if self._db is None:  # read-only state
+            return
+        with self._db:  # one transaction, committed on exit
+            self._db.executemany(
+                "INSERT OR IGNORE INTO uploaded_ids (value) VALUES (?)",
+                ((v,) for v in self._unsaved_ids),
+            )
+            self._db.executemany(
+                "INSERT OR IGNORE INTO uploaded_hashes (value) VALUES (?)",
+                ((v,) for v in self._unsaved_hashes),
+            )
+        self._unsaved_ids.clear()
+        self._unsaved_hashes.clear()
         self._ops_since_save = 0
 
     def flush(self) -> None:
@@ -272,9 +464,17 @@ class PhotosFilenameCache:
 
     Why a cache?  The Photos API has no search-by-filename endpoint; the only
     option is to page through every media item.  For large libraries that is
-    slow (minutes) so we persist the result in photos_filename_cache.json and
+    slow (minutes) so we persist the result in photos_filename_cache.txt and
     re-use it on subsequent runs.
 
+    Filenames are matched case-insensitively: every name is casefolded once,
+    when it enters the cache, and lookups casefold only the name asked about.
+
+    On-disk format: a header line "<last_updated>\t<item_count>", then one
+    casefolded filename per line, sorted.  Loading streams the lines straight
+    into the set, so a large library never exists as a JSON document plus a
+    list plus a set at the same time.
+
     Use --refresh-cache to force a full rescan (e.g. after bulk deletions or
     uploads from outside this script).
 
@@ -290,7 +490,7 @@ class PhotosFilenameCache:
         """
         self._get_token = get_token
         self._lock = threading.Lock()
-        self.filenames: Set[str] = set()
+        self._names: Set[str] = set()  # casefolded
         self.loaded = False
 
     def ensure_loaded(self, force_refresh: bool = False) -> None:
@@ -300,18 +500,38 @@ class PhotosFilenameCache:
 
         if not force_refresh and os.path.exists(PHOTOS_FILENAME_CACHE_FILE):
             print("Loading Photos filename cache from disk...")
-            with open(PHOTOS_FILENAME_CACHE_FILE) as fh:
-                data = json.load(fh)
-            self.filenames = set(data.get("filenames", []))
-            cached_at = data.get("last_updated", "unknown date")
+            # newline="\n": only "\n" separates entries, so a name that
+            # contains "\r" round-trips instead of splitting in two
+            with open(
+                PHOTOS_FILENAME_CACHE_FILE, encoding="utf-8", newline="\n"
+            ) as fh:
+                header = fh.readline().rstrip("\n")
+                # Casefolding is idempotent, so caches written by versions
+                # that stored names as-is load correctly too
+                self._names = {line.rstrip("\n").casefold() for line in fh}
+            self._names.discard("")
+            cached_at = header.split("\t", 1)[0] or "unknown date"
             print(
-                f"  {len(self.filenames):,} unique filenames loaded "
+                f"  {len(self._names):,} unique filenames loaded "
                 f"(cached {cached_at})"
             )
             print("  Tip: run with --refresh-cache to force a fresh scan.")
             self.loaded = True
             return
 
+        if not force_refresh and os.path.exists(LEGACY_PHOTOS_FILENAME_CACHE_FILE):
+            print("Migrating Photos filename cache to the line-based format...")
+            with open(LEGACY_PHOTOS_FILENAME_CACHE_FILE) as fh:
+                data = json.load(fh)
+            self._names = {n.casefold() for n in data.get("filenames", [])}
+            self._save(
+                data.get("last_updated", "unknown date"),
+                data.get("item_count", len(self._names)),
+            )
+            print(f"  {len(self._names):,} unique filenames loaded")
+            self.loaded = True
+            return
+
         self._rebuild()
 
     def _rebuild(self) -> None:
@@ -325,12 +545,17 @@ class PhotosFilenameCache:
         page_token: Optional[str] = None
         total_items = 0
 
+        # Page requests are strictly sequential (each needs the previous
+        # nextPageToken), so reuse one keep-alive connection for the whole
+        # scan instead of paying a TCP/TLS handshake per page.
+
         while True:
             params: Dict = {"pageSize": 100}
             if page_token:
                 params["pageToken"] = page_token
 
-            resp = requests.get(
+            _wait_for_rate_limit()
+            resp = _get_session().get(
                 PHOTOS_LIST_URL,
                 headers={"Authorization": f"Bearer {self._get_token()}"},
                 params=params,
@@ -338,7 +563,7 @@ class PhotosFilenameCache:
 
             if resp.status_code == 429:
                 print("  Rate-limited by Photos API — waiting 60 s …")
-                time.sleep(60)
+                _extend_rate_limit(60)
                 continue
 
             if resp.status_code != 200:
@@ -363,75 +588,139 @@ class PhotosFilenameCache:
             if not page_token:
                 break
 
-        self.filenames = set(filenames)
+        self._names = {n.casefold() for n in filenames}
         print(
-            f"  Done. {len(self.filenames):,} unique filenames "
+            f"  Done. {len(self._names):,} unique filenames "
             f"across {total_items:,} total Photos items."
         )
 
-        tmp_data = {
-            "last_updated": datetime.now(timezone.utc).isoformat(),
-            "filenames": sorted(self.filenames),
-            "item_count": total_items,
-        }
-        with open(PHOTOS_FILENAME_CACHE_FILE, "w") as fh:
-            json.dump(tmp_data, fh, indent=2)
-
+        self._save(datetime.now(timezone.utc).isoformat(), total_items)
         self.loaded = True
 
+    def _save(self, last_updated: str, item_count: int) -> None:
+        """Atomically write the cache file (header line + one name per line)."""
+        tmp = f"{PHOTOS_FILENAME_CACHE_FILE}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8", newline="\n") as fh:
+            fh.write(f"{last_updated}\t{item_count}\n")
+            # A name containing a newline cannot be represented one-per-line;
+            # it is simply not cached (worst case: one duplicate upload).
+            fh.writelines(
+                f"{name}\n" for name in sorted(self._names) if "\n" not in name
+            )
+        # The PID-unique tmp keeps concurrent instances from clobbering each
+        # other's half-written file; os.replace is atomic, last writer wins
+        os.replace(tmp, PHOTOS_FILENAME_CACHE_FILE)
+
+    def known(self, names: Set[str]) -> Set[str]:
+        """
+        Return the members of *names* (already casefolded) that are cached.
+
+        One set intersection, which iterates the smaller of the two sets, so
+        checking a few pending files against a huge library stays cheap and
+        nothing is copied.
+        """
+        with self._lock:
+            return names & self._names
+
     def contains(self, filename: str) -> bool:
+        key = filename.casefold()
         with self._lock:
-            return filename in self.filenames
+            return key in self._names
 
     def add(self, filename: str) -> None:
         """Update in-memory cache after a successful upload (thread-safe)."""
+        key = filename.casefold()
         with self._lock:
-            self.filenames.add(filename)
+            self._names.add(key)
 
 
 # ============================================================
 # Drive helpers
 # ============================================================
 
-# Each worker thread gets its own Drive API service object (not thread-safe)
+# Per-thread HTTP state: httplib2.Http and requests.Session connections must
+# not be shared between threads
 _thread_local = threading.local()
 
-# Serialise OAuth token refresh across threads so we never issue two concurrent
-# refresh requests (which would race on writing token.json)
-_creds_refresh_lock = threading.Lock()
+# One Drive service for the whole process; see _get_drive_service
+_drive_service = None
+_drive_service_lock = threading.Lock()
+
+
+def _get_authorized_http(creds: Credentials) -> google_auth_httplib2.AuthorizedHttp:
+    """Return the thread-local authorized httplib2 connection for Drive.
+
+    build_http() is what build() itself would use: it sets a socket timeout
+    (a bare httplib2.Http() has none, so a stalled call would hang its
+    worker forever) and stops httplib2 following 308 on resumable requests.
+    """
+    if not hasattr(_thread_local, "http"):
+        _thread_local.http = google_auth_httplib2.AuthorizedHttp(
+            creds, http=build_http()
+        )
+    return _thread_local.http
 
 
 def _get_drive_service(creds: Credentials):
-    """Return the thread-local Drive service, creating it on first access."""
-    if not hasattr(_thread_local, "drive"):
-        _thread_local.drive = build("drive", "v3", credentials=creds)
-    return _thread_local.drive
+    """Return the shared Drive service, building it on first access.
+
+    The service object is built (and its discovery document parsed) once.
+    Only the HTTP connection is unsafe to share, so every request the
+    service creates is bound to the calling thread's own AuthorizedHttp via
+    requestBuilder.  Requests must therefore be executed on the thread that
+    created them.
+
+    No transport tuning is needed for compression: googleapiclient's JSON
+    model already sends "Accept-Encoding: gzip" and a "(gzip)" user agent on
+    every request, so files.list responses arrive gzip-compressed.  Keep the
+    fields= masks on list calls narrow — every field requested is parsed.
+
+    The discovery document comes from the copy bundled with the client
+    library (static_discovery) rather than a network fetch, and
+    the legacy on-disk discovery cache, which only works with oauth2client,
+    is skipped.
+    """
+    global _drive_service
+    if _drive_service is None:
+        with _drive_service_lock:
+            if _drive_service is None:
+                _drive_service = build(
+                    "drive",
+                    "v3",
+                    credentials=creds,
+                    static_discovery=True,
+                    cache_discovery=False,
+                    requestBuilder=lambda _http, *args, **kwargs: HttpRequest(
+                        _get_authorized_http(creds), *args, **kwargs
+                    ),
+                )
+    return _drive_service
 
 
 def _get_session() -> requests.Session:
     """Return the thread-local requests.Session, creating it on first access.
 
-    Reusing a Session keeps the underlying TCP/TLS connection alive across the
-    two Photos API calls per file (upload bytes + batchCreate), eliminating one
-    TLS handshake per upload on average.
+    Reusing a Session keeps the underlying TCP/TLS connection alive across
+    consecutive Photos API calls made by the same thread (upload bytes in the
+    workers, batchCreate in the BatchCollector thread), eliminating a TLS
+    handshake per request.
+
+    Because sessions are per thread, each thread has its own connection:
+    the small batchCreate calls never queue behind a worker's in-flight
+    upload, which is what HTTP/2 multiplexing would otherwise buy here.
     """
     if not hasattr(_thread_local, "session"):
+        # The default adapter fits: one thread only ever needs one connection
+        # here, and it does not retry (callers handle retries explicitly)
         _thread_local.session = requests.Session()
     return _thread_local.session
 
 
-def _refresh_token_if_needed(creds: Credentials) -> None:
-    """Thread-safely refresh the OAuth access token when it has expired."""
-    with _creds_refresh_lock:
-        if not creds.valid:
-            creds.refresh(Request())
-
-
 def list_folders(drive_service, parent_id: str = "root") -> List[Dict]:
     """Return immediate child folders of *parent_id*, sorted by name."""
     query = (
         f"'{parent_id}' in parents "
-        "and mimeType = 'application/vnd.google-apps.folder' "
+        f"and mimeType = '{FOLDER_MIME_TYPE}' "
         "and trashed = false"
     )
     folders: List[Dict] = []
@@ -447,7 +736,7 @@ def list_folders(drive_service, parent_id: str = "root") -> List[Dict]:
                 orderBy="name",
                 pageToken=page_token,
             )
-            .execute()
+            .execute(num_retries=MAX_RETRIES)
         )
         folders.extend(resp.get("files", []))
         page_token = resp.get("nextPageToken")
@@ -457,16 +746,43 @@ def list_folders(drive_service, parent_id: str = "root") -> List[Dict]:
     return folders
 
 
-def folder_has_media(drive_service, folder_id: str) -> bool:
-    """Quick check: does this folder contain at least one supported media file?"""
-    mime_filter = " or ".join(f"mimeType='{m}'" for m in SUPPORTED_MIME_TYPES)
-    q = f"({mime_filter}) and '{folder_id}' in parents and trashed = false"
-    resp = (
-        drive_service.files()
-        .list(q=q, pageSize=1, fields="files(id)")
-        .execute()
+def list_folder_contents(
+    drive_service, parent_id: str = "root"
+) -> Tuple[List[Dict], bool]:
+    """
+    Return (child folders sorted by name, has_media) for *parent_id*.
+
+    Folders and supported media are fetched by a single query ordered
+    "folder,name", so every subfolder arrives before the first media file.
+    Paging stops at the first media file, which also answers has_media —
+    one round trip per browser step instead of two.
+    """
+    query = (
+        f"(mimeType = '{FOLDER_MIME_TYPE}' or {_MIME_FILTER_CLAUSE}) "
+        f"and '{parent_id}' in parents and trashed = false"
     )
-    return bool(resp.get("files"))
+    folders: List[Dict] = []
+    page_token: Optional[str] = None
+
+    while True:
+        resp = (
+            drive_service.files()
+            .list(
+                q=query,
+                pageSize=1000,
+                fields="nextPageToken, files(id, name, mimeType)",
+                orderBy="folder,name",
+                pageToken=page_token,
+            )
+            .execute(num_retries=MAX_RETRIES)
+        )
+        for item in resp.get("files", []):
+            if item["mimeType"] != FOLDER_MIME_TYPE:
+                return folders, True
+            folders.append({"id": item["id"], "name": item["name"]})
+        page_token = resp.get("nextPageToken")
+        if not page_token:
+            return folders, False
 
 
 def browse_folders(drive_service) -> Tuple[str, str]:
@@ -481,8 +797,7 @@ def browse_folders(drive_service) -> Tuple[str, str]:
     stack: List[Tuple[str, str]] = []
 
     while True:
-        folders = list_folders(drive_service, current_id)
-        has_media = folder_has_media(drive_service, current_id)
+        folders, has_media = list_folder_contents(drive_service, current_id)
 
         print(f"\n{'=' * 62}")
         print(f"  {current_name}")
@@ -541,44 +856,47 @@ def browse_and_select_multiple(
     return selected
 
 
-def collect_all_folder_ids(drive_service, parent_id: str) -> List[str]:
+def collect_all_folder_ids(
+    creds: Credentials,
+    root_ids: List[str],
+    workers: int = FOLDER_SCAN_WORKERS,
+) -> List[str]:
     """
-    Recursively collect the IDs of *parent_id* and all its descendants.
-
-    Depth-first traversal; prints each subfolder name as it goes so the
-    user can see progress in large trees.
+    Collect the IDs of every folder in *root_ids* and all their descendants.
+
+    Breadth-first traversal: every folder on the current level is listed
+    concurrently (each worker thread uses its own Drive connection), so wall
+    time grows with tree depth rather than folder count.  All roots share one
+    level, one pool and one seen-set, so overlapping selections are walked
+    once and concurrency never exceeds *workers*.  Prints each subfolder name
+    as it goes so the user can see progress in large trees.
     """
-    ids = [parent_id]
-    query = (
-        f"'{parent_id}' in parents "
-        "and mimeType = 'application/vnd.google-apps.folder' "
-        "and trashed = false"
-    )
-    page_token: Optional[str] = None
-
-    while True:
-        resp = (
-            drive_service.files()
-            .list(
-                q=query,
-                pageSize=1000,
-                fields="nextPageToken, files(id, name)",
-                pageToken=page_token,
+    ids = list(dict.fromkeys(root_ids))
+    seen: Set[str] = set(ids)
+    level = list(ids)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while level:
+            next_level: List[str] = []
+            children_per_parent = executor.map(
+                lambda fid: list_folders(_get_drive_service(creds), fid), level
             )
-            .execute()
-        )
-        for folder in resp.get("files", []):
-            print(f"      Subfolder: {folder['name']}")
-            ids.extend(collect_all_folder_ids(drive_service, folder["id"]))
-        page_token = resp.get("nextPageToken")
-        if not page_token:
-            break
+            for children in children_per_parent:
+                for folder in children:
+                    # A folder can have several parents; visit it only once
+                    if folder["id"] in seen:
+                        continue
+                    seen.add(folder["id"])
+                    print(f"      Subfolder: {folder['name']}")
+                    ids.append(folder["id"])
+                    next_level.append(folder["id"])
+            level = next_level
 
     return ids
 
 
 def list_drive_media(
-    drive_service,
+    creds: Credentials,
     folder_id: Optional[str],
     since: Optional[str],
     recursive: bool = True,
@@ -596,75 +914,237 @@ def list_drive_media(
     Returns a list of dicts with fields:
         id, name, mimeType, size, createdTime, modifiedTime
     """
-    mime_filter = " or ".join(f"mimeType='{m}'" for m in SUPPORTED_MIME_TYPES)
+    if folder_id:
+        return list_drive_media_multi(creds, [folder_id], since, recursive)
+    # No parent filter → entire Drive
+    return _list_media_query(
+        _get_drive_service(creds),
+        f"({_MIME_FILTER_CLAUSE}){_media_query_suffix(since)}",
+    )
+
+
+def list_drive_media_multi(
+    creds: Credentials,
+    root_ids: List[str],
+    since: Optional[str],
+    recursive: bool = True,
+) -> List[Dict]:
+    """
+    Return all supported media files in any of *root_ids*.
 
-    if folder_id and recursive:
-        print("  Scanning folder tree recursively …")
-        folder_ids = collect_all_folder_ids(drive_service, folder_id)
+    Like list_drive_media, but for several selected folders at once: their
+    trees are walked together (overlapping selections are listed once), and
+    all of it is queried together in groups of FOLDER_QUERY_BATCH_SIZE
+    parents per request, so a handful of small folders costs one round trip
+    rather than one each.
+    """
+    if recursive:
+        print("  Scanning folder tree(s) recursively …")
+        folder_ids = collect_all_folder_ids(creds, root_ids)
         print(f"  Found {len(folder_ids)} folder(s) total")
-    elif folder_id:
-        folder_ids = [folder_id]
     else:
-        folder_ids = [None]  # None → no parent filter → entire Drive
-
+        folder_ids = list(dict.fromkeys(root_ids))
+
+    suffix = _media_query_suffix(since)
+
+    # Check several folders per request: one round trip per group of
+    # FOLDER_QUERY_BATCH_SIZE folders instead of one per folder.  Pages of a
+    # single query must be fetched in order (each needs the previous
+    # nextPageToken), but separate groups are independent, so they run
+    # concurrently on per-thread Drive connections.
+    groups = [
+        folder_ids[start : start + FOLDER_QUERY_BATCH_SIZE]
+        for start in range(0, len(folder_ids), FOLDER_QUERY_BATCH_SIZE)
+    ]
     all_files: List[Dict] = []
+    with ThreadPoolExecutor(
+        max_workers=min(FOLDER_SCAN_WORKERS, len(groups))
+    ) as executor:
+        for files in executor.map(
+            lambda group: _list_media_in_folders(
+                _get_drive_service(creds), group, suffix
+            ),
+            groups,
+        ):
+            all_files.extend(files)
+
+    return all_files
 
+
+def _media_query_suffix(since: Optional[str]) -> str:
+    """Query clauses shared by every media listing: date filter and trash."""
+    suffix = ""
+    if since:
+        suffix += f" and modifiedTime > '{since}T00:00:00'"
+    return suffix + " and trashed = false"
+
+
+def _list_media_in_folders(
+    drive_service, folder_ids: List[str], suffix: str
+) -> List[Dict]:
+    """List supported media directly inside any of *folder_ids*."""
+    parents = " or ".join(f"'{fid}' in parents" for fid in folder_ids)
+    try:
+        return _list_media_query(
+            drive_service, f"({_MIME_FILTER_CLAUSE}) and ({parents}){suffix}"
+        )
+    except HttpError as exc:
+        if exc.resp.status != 400 or len(folder_ids) == 1:
+            raise
+    # Query rejected (e.g. too long) — fall back to one folder per query
+    files: List[Dict] = []
     for fid in folder_ids:
-        q = f"({mime_filter})"
-        if fid:
-            q += f" and '{fid}' in parents"
-        if since:
-            q += f" and modifiedTime > '{since}T00:00:00'"
-        q += " and trashed = false"
+        files.extend(
+            _list_media_query(
+                drive_service,
+                f"({_MIME_FILTER_CLAUSE}) and '{fid}' in parents{suffix}",
+            )
+        )
+    return files
 
-        page_token: Optional[str] = None
-        while True:
-            resp = (
-                drive_service.files()
-                .list(
-                    q=q,
-                    pageSize=1000,
-                    fields=(
-                        "nextPageToken, "
-                        "files(id, name, mimeType, size, createdTime, modifiedTime)"
-                    ),
-                    pageToken=page_token,
-                )
-                .execute()
+
+def _list_media_query(drive_service, q: str) -> List[Dict]:
+    """Run one media files.list query to completion, following all pages."""
+    files: List[Dict] = []
+    page_token: Optional[str] = None
+    while True:
+        resp = (
+            drive_service.files()
+            .list(
+                q=q,
+                pageSize=1000,
+                fields=(
+                    "nextPageToken, "
+                    "files(id, name, mimeType, size, createdTime, modifiedTime)"
+                ),
+                pageToken=page_token,
             )
-            all_files.extend(resp.get("files", []))
-            page_token = resp.get("nextPageToken")
-            if not page_token:
-                break
+            .execute(num_retries=MAX_RETRIES)
+        )
+        files.extend(resp.get("files", []))
+        page_token = resp.get("nextPageToken")
+        if not page_token:
+            break
+    return files
 
-    return all_files
 
+def download_file(drive_service, file_id: str) -> Tuple[bytes, str]:
+    """
+    Download a Drive file completely into memory.
+
+    Returns (content, content hash).  The hash is fed chunk by chunk as the
+    download arrives, so the content is never scanned a second time.
+    """
+    hasher = hashlib.new(CONTENT_HASH_ALGORITHM)
+    buf = io.BytesIO()
+    for chunk in iter_drive_file(drive_service, file_id):
+        hasher.update(chunk)
+        buf.write(chunk)
+    return buf.getvalue(), hasher.hexdigest()
 
-def download_file(drive_service, file_id: str) -> bytes:
-    """Download a Drive file completely into memory and return its bytes."""
+
+def iter_drive_file(
+    drive_service, file_id: str, chunk_size: int = DOWNLOAD_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Yield a Drive file's content chunk by chunk, holding one chunk at a time."""
     request = drive_service.files().get_media(fileId=file_id)
     buf = io.BytesIO()
-    downloader = MediaIoBaseDownload(buf, request)
+    downloader = MediaIoBaseDownload(buf, request, chunksize=chunk_size)
     done = False
     while not done:
         _, done = downloader.next_chunk()
-    return buf.getvalue()
+        chunk = buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+        if chunk:
+            yield chunk
+
+
+class DriveUploadBody:
+    """
+    Request body that streams a Drive file straight into a Photos upload.
+
+    requests sends an iterable body chunk by chunk and takes Content-Length
+    from len(), so the Drive download and the Photos upload overlap on the
+    wire and peak memory per worker is one chunk instead of the whole file.
+    Each iteration starts a fresh download, so a retried POST resends the
+    complete file.
+    """
+
+    def __init__(self, drive_service, file_id: str, size: int) -> None:
+        self._drive_service = drive_service
+        self._file_id = file_id
+        self._size = size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[bytes]:
+        return iter_drive_file(self._drive_service, self._file_id)
 
 
 # ============================================================
 # Google Photos upload helpers
 # ============================================================
 
+# Photos quotas are per project, so a 429 seen by one thread applies to all of
+# them.  Every Photos request waits out this shared monotonic-clock deadline
+# first, instead of each thread collecting its own 429 before backing off.
+_rate_limit_until = 0.0
+_rate_limit_lock = threading.Lock()
+
+
+def _wait_for_rate_limit() -> None:
+    """Block until any shared rate-limit back-off window has passed."""
+    delay = _rate_limit_until - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+
+
+def _extend_rate_limit(wait: float) -> None:
+    """Hold back every thread's Photos requests for at least *wait* seconds."""
+    global _rate_limit_until
+    with _rate_limit_lock:
+        _rate_limit_until = max(_rate_limit_until, time.monotonic() + wait)
+
+
+def _retry_delay(resp: requests.Response, attempt: int) -> float:
+    """
+    Seconds to wait before retrying after *resp*.
+
+    Honours the server's Retry-After (in seconds) when present, otherwise
+    backs off exponentially.  Up to 1 s of random jitter is added so threads
+    throttled at the same moment do not all retry in lockstep.
+    """
+    try:
+        delay = float(resp.headers["Retry-After"])
+    except (KeyError, ValueError):
+        delay = RETRY_BASE_DELAY * (2 ** attempt)
+    return delay + random.uniform(0, 1)
+
+
+def _retry_reason(resp: requests.Response) -> str:
+    """Short label for a retryable response, for progress messages."""
+    if resp.status_code == 429:
+        return "Rate-limited"
+    return f"Server error (HTTP {resp.status_code})"
+
+
 def photos_upload_bytes(
-    token: str, data: bytes, filename: str
+    token: str, data: Union[bytes, DriveUploadBody], filename: str
 ) -> Optional[str]:
     """
     Upload raw file bytes to the Photos resumable-upload endpoint.
 
+    *data* is either the complete file or a DriveUploadBody that streams it
+    from Drive while uploading.
+
     Returns the upload token string on success, or None on failure.
-    Retries up to MAX_RETRIES times on rate-limit (HTTP 429) responses.
+    Retries up to MAX_RETRIES times on rate-limit (HTTP 429) and transient
+    5xx responses.
     """
     for attempt in range(MAX_RETRIES):
+        _wait_for_rate_limit()
         resp = _get_session().post(
             PHOTOS_UPLOAD_URL,
             headers={
@@ -679,9 +1159,14 @@ def photos_upload_bytes(
         if resp.status_code == 200:
             return resp.text  # upload token
 
-        if resp.status_code == 429:
-            wait = RETRY_BASE_DELAY * (2 ** attempt)
-            _tlog(f"  Rate-limited (upload bytes) — retrying in {wait:.0f} s …")
+        if resp.status_code in RETRYABLE_STATUS_CODES:
+            wait = _retry_delay(resp, attempt)
+            _tlog(
+                f"  {_retry_reason(resp)} (upload bytes) "
+                f"— retrying in {wait:.0f} s …"
+            )
+            if resp.status_code == 429:
+                _extend_rate_limit(wait)
             time.sleep(wait)
             continue
 
@@ -695,68 +1180,6 @@ def photos_upload_bytes(
     return None
 
 
-def photos_create_item(
-    token: str,
-    upload_token: str,
-    filename: str,
-    description: Optional[str],
-) -> bool:
-    """
-    Create a Photos media item from a previously obtained upload token.
-
-    *filename* sets the display filename in Photos; it is passed both in
-    the upload-bytes step and here to make sure it round-trips correctly.
-
-    *description* stores original Drive metadata (creation date, etc.).
-    The Photos API silently truncates descriptions to 1 000 characters.
-
-    Returns True on success, False otherwise.
-    """
-    item: Dict = {
-        "simpleMediaItem": {
-            "uploadToken": upload_token,
-            "fileName": filename,
-        }
-    }
-    if description:
-        item["description"] = description[:1000]
-
-    for attempt in range(MAX_RETRIES):
-        resp = _get_session().post(
-            PHOTOS_BATCH_CREATE_URL,
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Content-type": "application/json",
-            },
-            json={"newMediaItems": [item]},
-        )
-
-        if resp.status_code == 429:
-            wait = RETRY_BASE_DELAY * (2 ** attempt)
-            _tlog(f"  Rate-limited (create item) — retrying in {wait:.0f} s …")
-            time.sleep(wait)
-            continue
-
-        if resp.status_code != 200:
-            _tlog(
-                f"  batchCreate failed (HTTP {resp.status_code}): "
-                f"{resp.text[:120]}"
-            )
-            break
-
-        results = resp.json().get("newMediaItemResults", [])
-        if not results:
-            return False
-
-        status = results[0].get("status", {})
-        # gRPC status: code 0 = OK.  The message field may say "Success".
-        return status.get("code", -1) == 0 or "success" in status.get(
-            "message", ""
-        ).lower()
-
-    return False
-
-
 # ============================================================
 # Thread-safe logging
 # ============================================================
@@ -782,19 +1205,28 @@ class BatchCollector:
 
     A dedicated daemon thread drives flushing:
       - Immediately when the buffer reaches 50 items.
-      - After at most 3 seconds of inactivity (so the tail of a run is never
-        stuck waiting).
+      - Once the oldest buffered item has waited 3 seconds (so the tail of a
+        run is never stuck waiting).
+    While the buffer is empty the thread sleeps until the next enqueue()
+    instead of waking on a fixed interval.
 
     Workers call enqueue() — which is non-blocking — and return "uploaded"
     optimistically.  Per-item success/failure is recorded asynchronously by
     _do_flush() once the API responds.
 
+    Items the API did not answer for, or rejected with a transient gRPC
+    status, are re-queued into a later batch (up to MAX_RETRIES times) rather
+    than failing the file outright.
+
     Call drain() after the thread pool has finished to flush any remaining
     items before printing the summary.
     """
 
     _BATCH_SIZE = 50
     _FLUSH_INTERVAL = 3.0  # seconds
+    # gRPC codes worth retrying per item: DEADLINE_EXCEEDED, RESOURCE_EXHAUSTED,
+    # INTERNAL, UNAVAILABLE.  Anything else (e.g. INVALID_ARGUMENT) is final.
+    _RETRYABLE_ITEM_CODES = frozenset({4, 8, 13, 14})
 
     def __init__(
         self,
@@ -806,9 +1238,15 @@ class BatchCollector:
         self._state = state
         self._photos_cache = photos_cache
 
-        self._lock = threading.Lock()
-        self._buffer: List[Dict] = []
+        # deque.append / popleft are atomic, so workers enqueue without
+        # taking a lock; only flushing threads serialise, on _flush_lock,
+        # which is held for the whole of a flush so the daemon thread and
+        # drain() never send batches concurrently.
+        self._buffer: Deque[Dict] = deque()
+        self._flush_lock = threading.Lock()
         self._flush_event = threading.Event()
+        # True while the flush thread sleeps with no deadline (empty buffer)
+        self._idle = False
         self._stopped = False
 
         self._thread = threading.Thread(target=self._flush_loop, daemon=True)
@@ -827,18 +1265,20 @@ class BatchCollector:
         prefix: str,
     ) -> None:
         """Add one item to the batch buffer (thread-safe, non-blocking)."""
-        with self._lock:
-            self._buffer.append({
-                "upload_token": upload_token,
-                "filename": filename,
-                "description": description,
-                "file_id": file_id,
-                "file_hash": file_hash,
-                "size_mb": size_mb,
-                "prefix": prefix,
-            })
-            if len(self._buffer) >= self._BATCH_SIZE:
-                self._flush_event.set()
+        self._buffer.append({
+            "upload_token": upload_token,
+            "filename": filename,
+            "description": description,
+            "file_id": file_id,
+            "file_hash": file_hash,
+            "size_mb": size_mb,
+            "prefix": prefix,
+            "queued_at": time.monotonic(),
+        })
+        # Wake the flush thread to start the deadline for a fresh buffer,
+        # or to send a full batch straight away
+        if self._idle or len(self._buffer) >= self._BATCH_SIZE:
+            self._flush_event.set()
 
     def drain(self) -> None:
         """Flush all remaining items; blocks until complete.  Call once, after
@@ -846,28 +1286,56 @@ class BatchCollector:
         self._stopped = True
         self._flush_event.set()
         self._thread.join(timeout=60)
-        # Safety net: flush anything left if the thread exited early
-        self._do_flush()
+        # Safety net: flush anything left if the thread exited early, or that
+        # was re-queued by the final flush
+        while self._buffer:
+            self._do_flush()
 
     # ---- Internal ----
 
+    def _seconds_until_due(self) -> Optional[float]:
+        """Time until the next flush is due: None while the buffer is empty,
+        0 when a full batch is waiting or the oldest item is overdue."""
+        try:
+            oldest = self._buffer[0]
+        except IndexError:
+            return None
+        if len(self._buffer) >= self._BATCH_SIZE:
+            return 0.0
+        deadline = oldest["queued_at"] + self._FLUSH_INTERVAL
+        return max(0.0, deadline - time.monotonic())
+
     def _flush_loop(self) -> None:
-        """Daemon thread: flush on signal or every _FLUSH_INTERVAL seconds."""
+        """Daemon thread: flush full batches at once, partial ones on deadline."""
         while not self._stopped:
-            self._flush_event.wait(timeout=self._FLUSH_INTERVAL)
-            self._flush_event.clear()
+            timeout = self._seconds_until_due()
+            if timeout is None:
+                # Publish the flag, then look again: an item appended before
+                # enqueue() could see it would otherwise never wake us.
+                self._idle = True
+                timeout = self._seconds_until_due()
+            if timeout is None or timeout > 0:
+                # enqueue() and drain() set the event; re-check state either way
+                self._flush_event.wait(timeout=timeout)
+                self._flush_event.clear()
+                self._idle = False
+                continue
+            self._idle = False
             self._do_flush()
         # One final flush after stop is requested
         self._do_flush()
 
     def _do_flush(self) -> None:
         """Pop up to _BATCH_SIZE items and send them to batchCreate."""
-        with self._lock:
-            if not self._buffer:
-                return
-            batch = self._buffer[: self._BATCH_SIZE]
-            self._buffer = self._buffer[self._BATCH_SIZE :]
-
+        with self._flush_lock:
+            batch: List[Dict] = []
+            while self._buffer and len(batch) < self._BATCH_SIZE:
+                batch.append(self._buffer.popleft())
+            if batch:
+                self._send_batch(batch)
+
+    def _send_batch(self, batch: List[Dict]) -> None:
+        """POST *batch* to batchCreate and record each item's outcome."""
         # Build the request body
         new_media_items = []
         for item in batch:
@@ -881,9 +1349,18 @@ class BatchCollector:
                 media_item["description"] = item["description"][:1000]
             new_media_items.append(media_item)
 
-        token = self._get_token()
+        try:
+            token = self._get_token()
+        except Exception as exc:
+            # e.g. RefreshError on a network blip.  Letting it escape would
+            # kill the flush thread (or abort drain() before state.flush())
+            # with this batch popped but never recorded.
+            for item in batch:
+                self._retry_or_fail(item, f"token refresh failed: {exc}")
+            return
 
         for attempt in range(MAX_RETRIES):
+            _wait_for_rate_limit()
             resp = _get_session().post(
                 PHOTOS_BATCH_CREATE_URL,
                 headers={
@@ -893,12 +1370,14 @@ class BatchCollector:
                 json={"newMediaItems": new_media_items},
             )
 
-            if resp.status_code == 429:
-                wait = RETRY_BASE_DELAY * (2 ** attempt)
+            if resp.status_code in RETRYABLE_STATUS_CODES:
+                wait = _retry_delay(resp, attempt)
                 _tlog(
-                    f"  Rate-limited (batch create, {len(batch)} items) "
+                    f"  {_retry_reason(resp)} (batch create, {len(batch)} items) "
                     f"— retrying in {wait:.0f} s …"
                 )
+                if resp.status_code == 429:
+                    _extend_rate_limit(wait)
                 time.sleep(wait)
                 continue
 
@@ -911,11 +1390,17 @@ class BatchCollector:
                     self._state.record_failure()
                 return
 
-            results = resp.json().get("newMediaItemResults", [])
-            for i, result in enumerate(results):
-                if i >= len(batch):
-                    break
-                item = batch[i]
+            # Match results by upload token rather than position, so a short
+            # or reordered response cannot attribute a status to the wrong file.
+            results = {
+                r.get("uploadToken"): r
+                for r in resp.json().get("newMediaItemResults", [])
+            }
+            for item in batch:
+                result = results.get(item["upload_token"])
+                if result is None:
+                    self._retry_or_fail(item, "no result returned")
+                    continue
                 status = result.get("status", {})
                 ok = status.get("code", -1) == 0 or "success" in status.get(
                     "message", ""
@@ -928,6 +1413,8 @@ class BatchCollector:
                         f"{item['prefix']} OK  {item['filename']}"
                         f"  ({item['size_mb']:.1f} MB)"
                     )
+                elif status.get("code") in self._RETRYABLE_ITEM_CODES:
+                    self._retry_or_fail(item, status.get("message", ""))
                 else:
                     _tlog(
                         f"{item['prefix']} FAIL (create item)  {item['filename']}"
@@ -940,6 +1427,19 @@ class BatchCollector:
         for _ in batch:
             self._state.record_failure()
 
+    def _retry_or_fail(self, item: Dict, reason: str) -> None:
+        """Re-queue *item* for a later batch, or record it as failed once it
+        has used up MAX_RETRIES attempts."""
+        item["attempts"] = item.get("attempts", 0) + 1
+        if item["attempts"] < MAX_RETRIES:
+            item["queued_at"] = time.monotonic()
+            self._buffer.append(item)
+            return
+        _tlog(
+            f"{item['prefix']} FAIL (create item)  {item['filename']}: {reason}"
+        )
+        self._state.record_failure()
+
 
 # ============================================================
 # Per-file worker  (runs in a thread-pool thread)
@@ -947,13 +1447,15 @@ class BatchCollector:
 
 def process_one_file(
     idx: int,
-    total: int,
     file: Dict,
+    *,
+    total: int,
     creds: Credentials,
+    token_mgr: TokenRefreshManager,
     state: SyncState,
     photos_cache: Optional[PhotosFilenameCache],
     dedup_mode: str,
-    batch_collector: Optional[BatchCollector] = None,
+    batch_collector: BatchCollector,
 ) -> str:
     """
     Download one file from Drive and upload it to Google Photos.
@@ -966,6 +1468,10 @@ def process_one_file(
       "filename+hash" — skip if EITHER the filename cache OR the hash set
                         contains a match
 
+    Whenever *photos_cache* is given (every mode except "none", and "hash"
+    with --strict-hash), a filename match skips the file before anything is
+    downloaded — on re-runs that is most files, at zero Drive egress.
+
     Returns one of: "uploaded" | "skipped" | "failed"
     """
     # Honour shutdown signal — return immediately so the thread-pool drains fast
@@ -974,13 +1480,15 @@ def process_one_file(
 
     file_id: str = file["id"]
     filename: str = file["name"]
-    size_mb: float = int(file.get("size", 0)) / (1024 ** 2)
+    # Drive returns size as a string, and omits it for some file types
+    file_size = int(file.get("size") or 0)
+    size_mb: float = file_size / BYTES_PER_MB
     prefix = f"[{idx}/{total}]"
 
     # ------------------------------------------------------------------
     # Pre-download dedup: filename check  (cheap — no network download)
     # ------------------------------------------------------------------
-    if dedup_mode in ("filename", "filename+hash") and photos_cache:
+    if photos_cache:
         if photos_cache.contains(filename):
             _tlog(f"{prefix} SKIP (filename match)  {filename}")
             state.record_skip()
@@ -989,9 +1497,17 @@ def process_one_file(
     # ------------------------------------------------------------------
     # Download file from Drive
     # ------------------------------------------------------------------
+    # Without hash dedup nothing needs the bytes before the upload, so stream
+    # them from Drive into Photos instead of buffering the whole file.
+    hash_dedup = dedup_mode in ("hash", "filename+hash")
+    content_hash: Optional[str] = None
     try:
         drive = _get_drive_service(creds)
-        data: bytes = download_file(drive, file_id)
+        data: Union[bytes, DriveUploadBody]
+        if hash_dedup or not file_size:
+            data, content_hash = download_file(drive, file_id)
+        else:
+            data = DriveUploadBody(drive, file_id, file_size)
     except Exception as exc:
         _tlog(f"{prefix} FAIL (download)  {filename}: {exc}")
         state.record_failure()
@@ -1001,8 +1517,8 @@ def process_one_file(
     # Post-download dedup: content hash check
     # ------------------------------------------------------------------
     file_hash: Optional[str] = None
-    if dedup_mode in ("hash", "filename+hash"):
-        file_hash = hashlib.sha256(data).hexdigest()
+    if hash_dedup:
+        file_hash = content_hash
         if state.is_uploaded_hash(file_hash):
             _tlog(f"{prefix} SKIP (hash match)  {filename}")
             state.record_skip()
@@ -1011,8 +1527,7 @@ def process_one_file(
     # ------------------------------------------------------------------
     # Upload to Google Photos
     # ------------------------------------------------------------------
-    _refresh_token_if_needed(creds)
-    token: str = creds.token
+    token = token_mgr.get_token()
 
     # Build a description that preserves original Drive metadata.
     # Google Photos itself reads EXIF data from the file for dates shown
@@ -1024,31 +1539,24 @@ def process_one_file(
         desc_parts.append(f"Modified: {file['modifiedTime']}")
     description = " | ".join(desc_parts)
 
-    upload_token = photos_upload_bytes(token, data, filename)
+    try:
+        upload_token = photos_upload_bytes(token, data, filename)
+    except Exception as exc:
+        # With a streamed body this includes Drive download errors
+        _tlog(f"{prefix} FAIL (transfer)  {filename}: {exc}")
+        state.record_failure()
+        return "failed"
     if not upload_token:
         _tlog(f"{prefix} FAIL (upload bytes)  {filename}")
         state.record_failure()
         return "failed"
 
-    if batch_collector is not None:
-        # Hand off to the batch collector — actual success/failure is recorded
-        # asynchronously once the batch fires.
-        batch_collector.enqueue(
-            upload_token, filename, description, file_id, file_hash, size_mb, prefix
-        )
-        return "uploaded"
-
-    ok = photos_create_item(token, upload_token, filename, description)
-    if ok:
-        state.record_success(file_id, file_hash)
-        if photos_cache:
-            photos_cache.add(filename)
-        _tlog(f"{prefix} OK  {filename}  ({size_mb:.1f} MB)")
-        return "uploaded"
-    else:
-        _tlog(f"{prefix} FAIL (create item)  {filename}")
-        state.record_failure()
-        return "failed"
+    # Hand off to the batch collector — actual success/failure is recorded
+    # asynchronously once the batch fires.
+    batch_collector.enqueue(
+        upload_token, filename, description, file_id, file_hash, size_mb, prefix
+    )
+    return "uploaded"
 
 
 # ============================================================
@@ -1065,7 +1573,8 @@ Dedup modes
   none          Upload everything (fastest; Photos may contain duplicates)
   filename      Skip files whose filename already exists in Photos     [default]
   hash          Download first, compute SHA-256, skip if same content
-                was uploaded before by this script
+                was uploaded before by this script (a filename match in
+                Photos skips the download, unless --strict-hash)
   filename+hash Skip if EITHER filename OR hash matches (most thorough)
 
 Examples
@@ -1121,6 +1630,11 @@ Examples
         "--skip-dedup", action="store_true",
         help="Skip all dedup checks — alias for --dedup-mode none",
     )
+    parser.add_argument(
+        "--strict-hash", action="store_true",
+        help="In hash mode, always download and compare content; "
+             "never skip on a filename match alone",
+    )
     parser.add_argument(
         "--refresh-cache", action="store_true",
         help="Force a full rescan of your Photos library (rebuilds cache)",
@@ -1143,7 +1657,8 @@ Examples
     # ----------------------------------------------------------------
     print("Authenticating with Google …")
     creds = authenticate()
-    drive = build("drive", "v3", credentials=creds)
+    token_mgr = TokenRefreshManager(creds)
+    drive = _get_drive_service(creds)
 
     # ----------------------------------------------------------------
     # Folder / scope selection
@@ -1163,21 +1678,19 @@ Examples
     # ----------------------------------------------------------------
     # Collect file list from Drive
     # ----------------------------------------------------------------
-    all_files: List[Dict] = []
-    for fid, fname in folder_specs:
-        print(f"\nListing media in: {fname}")
-        files = list_drive_media(drive, fid, args.since)
-        print(f"  {len(files):,} file(s) found")
-        all_files.extend(files)
-
-    # Deduplicate across folder selections (handles overlapping trees)
-    seen_ids: Set[str] = set()
-    unique_files: List[Dict] = []
-    for f in all_files:
-        if f["id"] not in seen_ids:
-            seen_ids.add(f["id"])
-            unique_files.append(f)
-    all_files = unique_files
+    print(f"\nListing media in: {', '.join(n for _, n in folder_specs)}")
+    if args.all:
+        all_files = list_drive_media(creds, None, args.since)
+    else:
+        # All selected folders share one set of batched queries
+        all_files = list_drive_media_multi(
+            creds, [fid for fid, _ in folder_specs], args.since
+        )
+    print(f"  {len(all_files):,} file(s) found")
+
+    # Deduplicate across folder selections (handles overlapping trees).
+    # Dicts keep first-insertion order, so files stay in listing order.
+    all_files = list({f["id"]: f for f in all_files}.values())
 
     print(f"\nTotal media files in scope: {len(all_files):,}")
     if not all_files:
@@ -1185,10 +1698,13 @@ Examples
         return
 
     # ----------------------------------------------------------------
-    # Filter files already recorded in uploaded_ids.json
+    # Filter files already recorded in sync_state.db
     # ----------------------------------------------------------------
-    state = SyncState(save_every=args.save_every)
-    pending = [f for f in all_files if not state.is_uploaded_id(f["id"])]
+    # A dry run must not create or migrate sync_state.db
+    state = SyncState(save_every=args.save_every, read_only=args.dry_run)
+    # No workers are running yet, so the set can be read without the lock
+    uploaded_ids = state.uploaded_ids
+    pending = [f for f in all_files if f["id"] not in uploaded_ids]
     already_done = len(all_files) - len(pending)
     print(f"Already uploaded (Drive ID match): {already_done:,}")
     print(f"Pending: {len(pending):,}")
@@ -1204,9 +1720,13 @@ Examples
     # ----------------------------------------------------------------
     # Load Photos filename cache (if needed for chosen dedup mode)
     # ----------------------------------------------------------------
+    # Hash mode uses the cache too, as a pre-download shortcut: a filename
+    # match is a near-certain duplicate and costs no Drive egress to detect.
     photos_cache: Optional[PhotosFilenameCache] = None
-    if args.dedup_mode in ("filename", "filename+hash"):
-        photos_cache = PhotosFilenameCache(lambda: creds.token)
+    if args.dedup_mode in ("filename", "filename+hash") or (
+        args.dedup_mode == "hash" and not args.strict_hash
+    ):
+        photos_cache = PhotosFilenameCache(token_mgr.get_token)
         photos_cache.ensure_loaded(force_refresh=args.refresh_cache)
 
     # ----------------------------------------------------------------
@@ -1217,22 +1737,33 @@ Examples
         print(f"  DRY RUN — {len(pending):,} pending file(s)")
         print("=" * 62)
 
+        # One set intersection finds every filename match up front; the loop
+        # below then only needs a membership test per file.
+        skip_keys: Set[str] = set()
+        if photos_cache:
+            skip_keys = photos_cache.known(
+                {f["name"].casefold() for f in pending}
+            )
+
+        # One write for the whole listing instead of a print() per file
+        lines: List[str] = []
         would_upload = 0
         would_skip = 0
         for f in pending:
-            size_mb = int(f.get("size", 0)) / (1024 ** 2)
+            size_mb = int(f.get("size") or 0) / BYTES_PER_MB
             skip_reason = ""
 
-            if photos_cache and photos_cache.contains(f["name"]):
+            if skip_keys and f["name"].casefold() in skip_keys:
                 skip_reason = "  [would skip: filename match]"
                 would_skip += 1
             else:
                 would_upload += 1
 
-            print(
+            lines.append(
                 f"  {f['name']}  ({size_mb:.1f} MB)"
-                f"  [{f['mimeType']}]{skip_reason}"
+                f"  [{f['mimeType']}]{skip_reason}\n"
             )
+        sys.stdout.write("".join(lines))
 
         print(f"\n  Would upload : {would_upload:,}")
         print(f"  Would skip   : {would_skip:,}")
@@ -1255,9 +1786,9 @@ Examples
         return
 
     # ----------------------------------------------------------------
-    # Ctrl+C handler — set shutdown event, let running tasks finish
+    # Ctrl+C / SIGTERM — set shutdown event, let running tasks finish
     # ----------------------------------------------------------------
-    def _handle_interrupt(sig, frame):  # noqa: ANN001
+    def _request_shutdown() -> None:
         if not state.shutdown.is_set():
             print(
                 "\n\nInterrupt received — finishing current uploads "
@@ -1265,7 +1796,22 @@ Examples
             )
             state.shutdown.set()
 
-    signal.signal(signal.SIGINT, _handle_interrupt)
+    if hasattr(signal, "pthread_sigmask"):
+        # Block the signals here, before any worker thread starts (threads
+        # inherit the mask), and receive them synchronously on a dedicated
+        # thread.  Shutdown then runs as ordinary thread code rather than
+        # inside a signal handler interrupting the main thread mid-operation.
+        shutdown_signals = {signal.SIGINT, signal.SIGTERM}
+        signal.pthread_sigmask(signal.SIG_BLOCK, shutdown_signals)
+
+        def _sigwait_loop() -> None:
+            while True:
+                signal.sigwait(shutdown_signals)
+                _request_shutdown()
+
+        threading.Thread(target=_sigwait_loop, daemon=True).start()
+    else:  # Windows
+        signal.signal(signal.SIGINT, lambda sig, frame: _request_shutdown())
 
     # ----------------------------------------------------------------
     # Thread pool execution
@@ -1275,40 +1821,45 @@ Examples
 
     # BatchCollector coalesces individual batchCreate calls into groups of 50,
     # reducing API round-trips by up to 50×.
-    batch_collector = BatchCollector(lambda: creds.token, state, photos_cache)
+    batch_collector = BatchCollector(token_mgr.get_token, state, photos_cache)
+
+    # Each submitted task holds a slot until it finishes, so at most
+    # SUBMIT_AHEAD_PER_WORKER tasks per worker wait in the executor's queue.
+    submit_slots = threading.Semaphore(args.workers * SUBMIT_AHEAD_PER_WORKER)
+
+    def _task_done(future: Future, name: str) -> None:
+        submit_slots.release()
+        if future.cancelled():
+            return
+        exc = future.exception()
+        if exc is not None:
+            _tlog(f"  Unhandled exception for {name}: {exc}")
+            state.record_failure()
+
+    # Arguments shared by every task are bound once, so each submit only
+    # carries the file and its index.
+    run_file = functools.partial(
+        process_one_file,
+        total=total,
+        creds=creds,
+        token_mgr=token_mgr,
+        state=state,
+        photos_cache=photos_cache,
+        dedup_mode=args.dedup_mode,
+        batch_collector=batch_collector,
+    )
 
     with ThreadPoolExecutor(max_workers=args.workers) as executor:
-        # Submit all tasks upfront.  ThreadPoolExecutor queues them internally
-        # and dispatches up to max_workers at a time — no manual chunking needed.
-        futures = {
-            executor.submit(
-                process_one_file,
-                idx,
-                total,
-                file,
-                creds,
-                state,
-                photos_cache,
-                args.dedup_mode,
-                batch_collector,
-            ): file["name"]
-            for idx, file in enumerate(pending, 1)
-        }
-
-        # Consume results as they complete
-        for future in as_completed(futures):
+        for idx, file in enumerate(pending, 1):
+            submit_slots.acquire()
             if state.shutdown.is_set():
-                # Cancel futures that haven't started yet
-                for f in futures:
-                    f.cancel()
+                # Drop queued tasks that haven't started yet
+                executor.shutdown(wait=False, cancel_futures=True)
                 break
-
-            try:
-                future.result()
-            except Exception as exc:
-                name = futures[future]
-                _tlog(f"  Unhandled exception for {name}: {exc}")
-                state.record_failure()
+            future = executor.submit(run_file, idx, file)
+            future.add_done_callback(
+                lambda f, name=file["name"]: _task_done(f, name)
+            )
 
     # Flush any upload tokens that haven't been sent yet
     batch_collector.drain()
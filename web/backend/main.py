@@ -1,6 +1,8 @@
 import asyncio
+import codecs
 import sys
 import os
+import orjson
 from fastapi import FastAPI
 from fastapi.responses import StreamingResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
@@ -34,8 +36,20 @@ class PhotosSyncRequest(BaseModel):
     sync_all: bool = False
     workers: int = 10
     dedup_mode: str = "filename"
+    strict_hash: bool = False
     dry_run: bool = False
 
+# Subprocess output is forwarded in SSE frames holding whatever arrived within
+# SSE_FLUSH_INTERVAL seconds, up to SSE_MAX_FRAME_BYTES, rather than one frame
+# per read.
+SSE_READ_SIZE = 4096
+SSE_FLUSH_INTERVAL = 0.05
+SSE_MAX_FRAME_BYTES = 4096
+
+def sse_text_frame(text: str) -> bytes:
+    """Encode text as one SSE data frame in the {"text": ...} shape app.js parses."""
+    return b"data: " + orjson.dumps({"text": text}) + b"\n\n"
+
 async def run_command_stream(cmd: list[str], cwd: Optional[str] = None):
     """Run a subprocess and yield its stdout/stderr as a stream in real-time."""
     # Force python and tqdm to be unbuffered to ensure we get live output
@@ -51,39 +65,52 @@ async def run_command_stream(cmd: list[str], cwd: Optional[str] = None):
         env=env
     )
 
+    loop = asyncio.get_running_loop()
+    pending = bytearray()
+    flush_at = None
+    # A multi-byte UTF-8 character can straddle two reads; the incremental
+    # decoder holds its leading bytes back until the rest arrives.
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
     try:
         while True:
-            # Read single bytes or small chunks to catch \r without waiting for \n
-            chunk = await process.stdout.read(64)
-            if not chunk:
-                break
-            
-            # Yield chunked SSE format
-            text = chunk.decode('utf-8', errors='replace')
-            # Replace carriage returns with a unique token or handle directly
-            # For SSE, standard newlines mark the end of a message.
-            # We'll split the text and emit it so the browser receives it as data.
-            # We must be careful because text might just be a partial string without newline.
-            # In SSE, `data: <string>\n\n` is the packet. We can just send the raw text.
-            # The browser will concatenate these chunks.
-            # Wait, SSE expects properly formatted lines. If we want raw streaming, 
-            # we should send each chunk as a separate data packet and let the frontend assemble it.
-            # BUT: Server-Sent Events are line-oriented.
-            # Better approach: stream characters until \n or \r.
-            pass
-            
-            # Let's fix this properly. 
-            # We yield every chunk as a JSON string inside a data payload so \r is preserved.
-            import json
-            yield f"data: {json.dumps({'text': text})}\n\n"
+            # read() returns as soon as *any* output is available, so a bigger
+            # size does not hold back \r progress updates; it only means fewer
+            # wake-ups when the process writes a lot at once.
+            timeout = None if flush_at is None else max(0.0, flush_at - loop.time())
+            try:
+                chunk = await asyncio.wait_for(process.stdout.read(SSE_READ_SIZE), timeout)
+            except asyncio.TimeoutError:
+                pass  # Flush deadline reached; send what we have
+            else:
+                if not chunk:
+                    break
+                if not pending:
+                    flush_at = loop.time() + SSE_FLUSH_INTERVAL
+                pending += chunk
+                if len(pending) < SSE_MAX_FRAME_BYTES and loop.time() < flush_at:
+                    continue
+
+            # Each frame is a JSON string inside a data payload so \r is preserved;
+            # the browser concatenates the frames.
+            text = decoder.decode(pending)
+            pending.clear()
+            flush_at = None
+            if text:
+                yield sse_text_frame(text)
+
+        text = decoder.decode(pending, final=True)
+        if text:
+            yield sse_text_frame(text)
 
     except asyncio.CancelledError:
         process.terminate()
-        yield "data: {\"text\": \"\\n[Process cancelled by client.]\"}\n\n"
+        yield sse_text_frame("\n[Process cancelled by client.]")
         raise
 
     await process.wait()
-    yield f"data: {json.dumps({'text': f'\\n[PROCESS_COMPLETE] Exit Code: {process.returncode}\\n'})}\n\n"
+    done_text = f"\n[PROCESS_COMPLETE] Exit Code: {process.returncode}\n"
+    yield sse_text_frame(done_text)
 
 @app.post("/api/sync/drive")
 async def trigger_drive_sync(req: DriveSyncRequest):
@@ -116,7 +143,9 @@ async def trigger_photos_sync(req: PhotosSyncRequest):
         cmd.append("--all")
     elif req.folder:
         cmd.extend(["--folder", req.folder])
-        
+
+    if req.strict_hash and req.dedup_mode == "hash":
+        cmd.append("--strict-hash")
     if req.dry_run:
         cmd.append("--dry-run")
 
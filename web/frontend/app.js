@@ -235,6 +235,7 @@ document.addEventListener('DOMContentLoaded', () => {
             folder: scope === 'folder' ? document.getElementById('dp-folder').value : null,
             workers: parseInt(document.getElementById('dp-workers').value, 10),
             dedup_mode: document.getElementById('dp-dedup').value,
+            strict_hash: document.getElementById('dp-strict-hash').checked,
             dry_run: document.getElementById('dp-dry-run').checked
         };
 